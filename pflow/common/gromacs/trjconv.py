@@ -2,7 +2,6 @@ import os, sys
 import logging
 from typing import Optional,Sequence
 from pflow.common.gromacs.gmx_constant import gmx_trjconv_cmd, gmx_traj_cmd
-from pflow.constants import gmx_align_name
 from pflow.utils import list_to_string
 from pflow.utils import run_command
 
@@ -35,61 +34,36 @@ def pbc_trjconv(
     )
     assert return_code == 0, err
     
-def center_trjconv(
+def fit_center_trjconv(
         xtc: str = "md_nopbc.xtc",
         top: str = "topol.tpr",
+        fit_group: int = 1,
+        center_group: int = 1,
         output_group: int = 1,
-        output: str = "md_center.xtc"
+        output: str = "md_center.xtc",
+        center: bool = True,
+        begin: Optional[float] = None,
+        end: Optional[float] = None
     ):
-    logger.info("handling pbc by gmx trjconv command ...")
-    cmd_list = gmx_trjconv_cmd.split()
-    cmd_list += ["-f", str(xtc)]
-    cmd_list += ["-s", str(top)]
-    cmd_list += ["-o", output]
-    cmd_list += ["-center"]
-    logger.info(list_to_string(cmd_list, " "))
-    return_code, out, err = run_command(
-        cmd_list,
-        stdin=f"{1}\n{output_group}\n"
-    )
-    assert return_code == 0, err
-    
-def align_trjconv(
-        xtc: str = "md_center.xtc",
-        top: str = "topol.tpr",
-        output_group: int = 1,
-        output: str = gmx_align_name
-    ):
-    logger.info("aligning traj by gmx trjconv command ...")
+    logger.info("aligning and centering traj by one gmx trjconv command ...")
     cmd_list = gmx_trjconv_cmd.split()
     cmd_list += ["-f", str(xtc)]
     cmd_list += ["-s", str(top)]
     cmd_list += ["-o", output]
     cmd_list += ["-fit", "rot+trans"]
+    stdin = f"{fit_group}\n"
+    if center:
+        cmd_list += ["-center"]
+        stdin += f"{center_group}\n"
+    stdin += f"{output_group}\n"
+    if begin is not None:
+        cmd_list += ["-b", str(begin)]
+    if end is not None:
+        cmd_list += ["-e", str(end)]
     logger.info(list_to_string(cmd_list, " "))
     return_code, out, err = run_command(
         cmd_list,
-        stdin=f"{1}\n{output_group}\n"
-    )
-    assert return_code == 0, err
-    
-def begin_trjconv(
-        xtc: str = gmx_align_name,
-        top: str = "topol.tpr",
-        output_group: int = 1,
-        output: str = "begin.gro"
-    ):
-    logger.info("generating first frame by gmx trjconv command ...")
-    cmd_list = gmx_trjconv_cmd.split()
-    cmd_list += ["-f", str(xtc)]
-    cmd_list += ["-s", str(top)]
-    cmd_list += ["-o", output]
-    cmd_list += ["-b", "0"]
-    cmd_list += ["-e", "0"]
-    logger.info(list_to_string(cmd_list, " "))
-    return_code, out, err = run_command(
-        cmd_list,
-        stdin=f"{output_group}\n"
+        stdin=stdin
     )
     assert return_code == 0, err
 
@@ -1,6 +1,6 @@
 import os
 import sys
-from typing import List, Dict, Sequence, Union
+from typing import List, Dict, Sequence, Tuple, Union
 import logging
 import mdtraj as md
 import dpdata
@@ -19,10 +19,7 @@ logger = logging.getLogger(__name__)
 
 
 def _zip_dict(resi_indices, atom_indices):
-    dihedral_dict = {}
-    for idx, resi_idx in enumerate(resi_indices):
-        dihedral_dict[resi_idx] = atom_indices[idx].tolist()
-    return dihedral_dict
+    return dict(zip(resi_indices.tolist(), atom_indices.tolist()))
 
 def distance(r1,r2):
     d = 0
@@ -49,28 +46,42 @@ def get_dihedral_info(file_path: str):
     return dihedral_angle
 
 
-def get_dihedral_from_resid(file_path: str, selected_resid: List[int]) -> Dict:
+def get_dihedral_array_from_resid(
+        file_path: str,
+        selected_resid: List[int]
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return residue ids `(L,)`, angle ids `(L,)` (0 for phi, 1 for psi) and
+    1-based atom ids `(L, 4)` of the dihedrals of the selected residues."""
     if len(selected_resid) == 0:
-        return {}
+        return np.zeros(0, np.int32), np.zeros(0, np.int32), np.zeros((0, 4), np.int32)
     traj = md.load(file_path)
     top = traj.topology
-    psi_found_indices, psi_atom_indices = _atom_sequence(top, PSI_ATOMS)
-    psi_info = _zip_dict(psi_found_indices + 1, psi_atom_indices + 1)
     phi_found_indices, phi_atom_indices = _atom_sequence(top, PHI_ATOMS)
-    phi_info = _zip_dict(phi_found_indices + 1, phi_atom_indices + 1)
-    selected_dihedral_angle = {}
+    psi_found_indices, psi_atom_indices = _atom_sequence(top, PSI_ATOMS)
+    # Selected protein residues (0-based), repeated residues are kept once
     residue_list = list(top.residues)
-    for sid in selected_resid:
-        residue = residue_list[sid-1]
-        if residue.is_protein:
-            selected_dihedral_angle[residue.index+1] = {}
-            if residue.index in phi_found_indices:
-                selected_dihedral_angle[residue.index+1]["phi"] = phi_info[residue.index+1]
-            if residue.index in psi_found_indices:
-                selected_dihedral_angle[residue.index+1]["psi"] = psi_info[residue.index+1]
-    num_cv = len(selected_dihedral_angle.keys())
-    logger.info(f"{num_cv} CVs have been created.")
-    return selected_dihedral_angle
+    sel = []
+    for sid in dict.fromkeys(selected_resid):
+        if residue_list[sid-1].is_protein:
+            sel.append(residue_list[sid-1].index)
+    sel = np.asarray(sel, dtype=np.int64)
+    logger.info(f"{len(sel)} CVs have been created.")
+    # Row of each residue in the stacked phi/psi atom table, -1 if absent
+    n_phi = len(phi_found_indices)
+    phi_row = np.full(top.n_residues, -1, dtype=np.int64)
+    phi_row[phi_found_indices] = np.arange(n_phi)
+    psi_row = np.full(top.n_residues, -1, dtype=np.int64)
+    psi_row[psi_found_indices] = np.arange(n_phi, n_phi + len(psi_found_indices))
+    rows = np.stack([phi_row[sel], psi_row[sel]], axis=1).ravel()
+    valid = rows >= 0
+    all_atom_indices = np.concatenate(
+        [np.reshape(phi_atom_indices, (-1, 4)), np.reshape(psi_atom_indices, (-1, 4))]
+    )
+    return (
+        np.repeat(sel + 1, 2)[valid].astype(np.int32),
+        np.tile(np.array([0, 1], dtype=np.int32), len(sel))[valid],
+        (all_atom_indices[rows[valid]] + 1).astype(np.int32)
+    )
 
 def get_distance_from_atomid(file_path: str, selected_atomid: List[int]) -> Dict:
     if len(selected_atomid) == 0:
@@ -2,5 +2,6 @@ from pflow.common.plumed.make_plumed import (
     make_plain_plumed,
     make_restraint_plumed,
     make_distance_list_from_file,
+    get_cached_distance_from_atomid,
     get_cv_name
 )
\ No newline at end of file
@@ -1,19 +1,13 @@
 import json
 import os
+import re
 import sys
 import logging
 import numpy as np
+from functools import lru_cache
 from typing import List, Union, Tuple, Dict, Optional, Sequence
-from pflow.utils import list_to_string
-from pflow.common.mol import get_dihedral_from_resid, get_distance_from_atomid
-from pflow.common.plumed.plumed_constant import (
-    dihedral_name,
-    distance_name,
-    dihedral_def_from_atoms,
-    distance_def_from_atoms,
-    print_def,
-    moving_restraint_def
-)
+from pflow.common.mol import get_dihedral_array_from_resid, get_distance_from_atomid
+from pflow.common.plumed.plumed_constant import print_def
 
 
 logging.basicConfig(
@@ -25,10 +19,7 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-angle_id = {
-    "phi": 0,
-    "psi": 1
-}
+_print_arg_pattern = re.compile(r"ARG=([^\s]+)")
 
 
 def make_restraint(
@@ -40,19 +31,10 @@ def make_restraint(
         at: Union[str, int, float],
         final: Union[str, int, float]
     ):
-    return moving_restraint_def.format(
-                name = name,
-                arg = arg,
-                step0 = 0,
-                at0 = at,
-                kappa0 = kappa,
-                step1 = step,
-                at1 = final,
-                kappa1 = kappa,
-                step2 = nsteps,
-                at2 = final,
-                kappa2 = kappa
-            )
+    return (f"{name}: MOVINGRESTRAINT ARG={arg} "
+            f"STEP0=0 AT0={at} KAPPA0={kappa} "
+            f"STEP1={step} AT1={final} KAPPA1={kappa} "
+            f"STEP2={nsteps} AT2={final} KAPPA2={kappa}")
 
 def make_moving_restraint_list(
         cv_list: List[str],
@@ -67,6 +49,8 @@ def make_moving_restraint_list(
     res_list = []
     assert len(cv_list) == len(kappa), "Make sure `kappa` and `cv_names` have the same length."
     assert len(cv_list) == len(at), "Make sure `at` and `cv_names` have the same length."
+    assert len(cv_list) == len(step), "Make sure `step` and `cv_names` have the same length."
+    assert len(cv_list) == len(final), "Make sure `final` and `cv_names` have the same length."
     for idx, cv_print in enumerate(cv_list):
         res_name = "res-" + cv_print
         res_names.append(res_name)
@@ -81,7 +65,7 @@ def make_print_bias(
     ) -> str:
     return print_def.format(
         stride = stride,
-        arg = list_to_string(name_list, ","),
+        arg = ",".join(map(str, name_list)),
         file = file_name
     )
 
@@ -92,40 +76,64 @@ def make_print(
     ) -> str:
     return print_def.format(
         stride = stride,
-        arg = list_to_string(name_list, ","),
+        arg = ",".join(map(str, name_list)),
         file = file_name
     )
 
 
 def make_wholemolecules(atom_index):
-    arg_list = list_to_string(atom_index, ",")
+    arg_list = ",".join(map(str, atom_index))
     return ("WHOLEMOLECULES" + " " +
             "ENTITY0=" + arg_list +
             "\n")
 
 
-def user_plumed_def(cv_file, pstride, pfile):
-    logger.info("Custom CVs are created from plumed files.")
-    ret = ""
+@lru_cache(maxsize=None)
+def _parse_cv_file(cv_path: str, mtime_ns: int) -> Tuple[str, Tuple[str, ...], Optional[str]]:
+    # `mtime_ns` is only part of the cache key, so edited files are re-parsed.
     cv_names = []
     print_content = None
-    print("cv_file name",cv_file)
-    with open(cv_file, 'r') as fp:
-        for line in fp.readlines():
-            if ("PRINT" in line) and ("#" not in line):
-                print_content = line + "\n"
-                cv_names = line.split()[2].split("=")[1].split(",")
-                break
-            ret += line
+    with open(cv_path, 'r') as fp:
+        text = fp.read()
+    prefix = []
+    for line in text.splitlines(keepends=True):
+        if line.lstrip().startswith("#"):
+            prefix.append(line)
+            continue
+        if "PRINT" in line:
+            print_content = line + "\n"
+            match = _print_arg_pattern.search(line)
+            if match is not None:
+                cv_names = match.group(1).split(",")
+            break
+        prefix.append(line)
+    ret = "".join(prefix)
     if ret == "" or cv_names == []:
         raise RuntimeError("Invalid customed plumed files.")
+    print_template = None
     if print_content is not None:
         assert len(print_content.split(",")) == len(cv_names), "There are {} CVs defined in the plumed file, while {} CVs are printed.".format(len(cv_names), len(print_content.split(",")) )
-        print_content_list = print_content.split()
-        print_content_list[-1] = "FILE={}".format(pfile)
-        print_content_list[1] = "STRIDE={}".format(str(pstride))
-        print_content = " ".join(print_content_list)
-    return ret, cv_names, print_content
+        print_template_list = []
+        for token in print_content.split():
+            if token.startswith("STRIDE="):
+                print_template_list.append("STRIDE={stride}")
+            elif token.startswith("FILE="):
+                print_template_list.append("FILE={file}")
+            else:
+                print_template_list.append(token.replace("{", "{{").replace("}", "}}"))
+        print_template = " ".join(print_template_list)
+    return ret, tuple(cv_names), print_template
+
+
+def user_plumed_def(cv_file, pstride, pfile):
+    logger.info("Custom CVs are created from plumed files.")
+    print("cv_file name",cv_file)
+    cv_path = os.path.abspath(cv_file)
+    ret, cv_names, print_template = _parse_cv_file(cv_path, os.stat(cv_path).st_mtime_ns)
+    print_content = None
+    if print_template is not None:
+        print_content = print_template.format(stride=pstride, file=pfile)
+    return ret, list(cv_names), print_content
 
 
 def make_torsion(
@@ -133,84 +141,95 @@ def make_torsion(
         atom_list: List[Union[int, str]]
     ) -> str:
     assert len(atom_list) == 4, f"Make sure dihedral angle defined by 4 atoms, not {len(atom_list)}."
-    return dihedral_def_from_atoms.format(
-        name = name,
-        a1 = atom_list[0], a2 = atom_list[1],
-        a3 = atom_list[2], a4 = atom_list[3],
-    )
+    return f"{name}: TORSION ATOMS={atom_list[0]},{atom_list[1]},{atom_list[2]},{atom_list[3]}"
 
 def make_distance(
         name: str,
         atom_list: List[Union[int, str]]
     ) -> str:
     assert len(atom_list) == 2, f"Make sure distance defined by 2 atoms, not {len(atom_list)}."
-    return distance_def_from_atoms.format(
-        name = name,
-        a1 = atom_list[0], a2 = atom_list[1]
-    )
+    return f"{name}: DISTANCE ATOMS={atom_list[0]},{atom_list[1]}"
 
 
 def make_torsion_name(resid: int, angid: int):
-    return dihedral_name.format(
-        resid = resid,
-        angid = angid
-    )
+    return sys.intern(f"dih-{resid:03d}-{angid:02d}")
 
 def make_distance_name(atomids: list):
-    return distance_name.format(
-    atomid1 = int(atomids[0]),
-    atomid2 = int(atomids[1])
-    )
-
-def make_torsion_list(
-        dihedral_info: Dict,
-    ) -> Tuple[List, List]:
-    torsion_list = []
-    torsion_name_list = []
-    for resid in dihedral_info.keys():
-        for ang in dihedral_info[resid].keys():
-            torsion_name = make_torsion_name(resid=resid, angid = angle_id[ang])
-            torsion_name_list.append(torsion_name)
-            torsion_list.append(make_torsion(
-                name = torsion_name,
-                atom_list=list(dihedral_info[resid][ang])
-            ))
-    return torsion_list, torsion_name_list
+    return sys.intern(f"dis-{int(atomids[0]):05d}-{int(atomids[1]):05d}")
 
 def make_distance_list(
         distance_info: Dict,
     ) -> Tuple[List, List]:
-    distance_list = []
-    distance_name_list = []
-    for atomids in distance_info.keys():
-        dis = distance_info[atomids]
-        atom_list = atomids.split(" ")
-        distance_name = make_distance_name(atomids=atom_list)
-        distance_name_list.append(distance_name)
-        distance_list.append(make_distance(
-            name = distance_name,
-            atom_list=atom_list)
-        )
+    pairs = [
+        (make_distance_name(atom_list), atom_list)
+        for atom_list in (atomids.split(" ") for atomids in distance_info)
+    ]
+    distance_name_list = [name for name, _ in pairs]
+    distance_list = [make_distance(name, atom_list) for name, atom_list in pairs]
     return distance_list, distance_name_list
 
+def make_torsion_list_from_array(
+        resids: np.ndarray,
+        angids: np.ndarray,
+        atom_ids: np.ndarray
+    ) -> Tuple[List, List]:
+    torsion_name_list = [make_torsion_name(r, a) for r, a in zip(resids.tolist(), angids.tolist())]
+    torsion_list = [make_torsion(name, atoms) for name, atoms in zip(torsion_name_list, atom_ids.tolist())]
+    return torsion_list, torsion_name_list
+
+@lru_cache(maxsize=32)
+def _cached_dihedral(
+        file_path: str, mtime_ns: int, selected_resid: Tuple[int, ...]
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    return get_dihedral_array_from_resid(file_path, list(selected_resid))
+
+@lru_cache(maxsize=32)
+def _cached_distance(file_path: str, mtime_ns: int, selected_atomid: Tuple[Tuple[int, ...], ...]) -> Dict:
+    return get_distance_from_atomid(file_path, [list(sid) for sid in selected_atomid])
+
+def get_cached_distance_from_atomid(
+        file_path: str,
+        selected_atomid: List[List[int]]
+    ) -> Dict:
+    file_path = os.path.abspath(file_path)
+    return _cached_distance(
+        file_path, os.stat(file_path).st_mtime_ns,
+        tuple(tuple(sid) for sid in selected_atomid)
+    )
+
 def make_torsion_list_from_file(
         file_path: str,
         selected_resid: List[int]
     ) -> Tuple[List, List]:
-    cv_info = get_dihedral_from_resid( file_path, selected_resid)
+    file_path = os.path.abspath(file_path)
+    resids, angids, atom_ids = _cached_dihedral(
+        file_path, os.stat(file_path).st_mtime_ns, tuple(selected_resid)
+    )
     logger.info("Create CVs (torsion) from selected residue ids.")
-    assert len(cv_info.keys()) > 0, "No valid CVs created."
-    return make_torsion_list(cv_info)
+    assert len(atom_ids) > 0, "No valid CVs created."
+    return make_torsion_list_from_array(resids, angids, atom_ids)
 
 def make_distance_list_from_file(
         file_path: str,
         selected_atomid: List[int]
     ) -> Tuple[List, List]:
-    cv_info = get_distance_from_atomid(file_path, selected_atomid)
+    cv_info = get_cached_distance_from_atomid(file_path, selected_atomid)
     logger.info("Create CVs (distance) from selected atom ids.")
     assert len(cv_info.keys()) > 0, "No valid CVs created."
     return make_distance_list(cv_info)
 
+def _pick_cv(cv_files: List[Union[str, os.PathLike]]) -> Union[str, os.PathLike]:
+    # Only the last non-pdb file was ever used by the custom mode.
+    cv_file_ = next((f for f in reversed(cv_files) if not os.fspath(f).endswith(".pdb")), None)
+    assert cv_file_ is not None, "No plumed file found in `cv_file`."
+    return cv_file_
+
+def _bcast(x, n: int):
+    # Only scalars are broadcast, sequences keep their values and are length-checked later.
+    if isinstance(x, (int, float, str, np.generic)):
+        return [x] * n
+    return x
+
 def make_restraint_plumed(
         conf: Optional[str] = None,
         cv_file: Optional[List[str]] = None,
@@ -235,18 +254,15 @@ def make_restraint_plumed(
             make_distance_list_from_file(conf, selected_atomid)
         content_list += cv_content_list
     elif mode == "custom":
-        for cv_file_ in cv_file:
-            if not os.path.basename(cv_file_).endswith("pdb"):
-                ret, cv_name_list, _ = user_plumed_def(cv_file_, stride, output)
-        content_list.append(ret)
+        ret, cv_name_list, _ = user_plumed_def(_pick_cv(cv_file), stride, output)
+        # Lines read from the user file keep their own newlines.
+        content_list.append(ret.rstrip("\n"))
     else:
         raise RuntimeError("Unknown mode for making plumed files.")
 
-    if isinstance(kappa, int) or isinstance(kappa, float):
-        kappa = [kappa for _ in range(len(cv_name_list))]
-    if isinstance(at, int) or isinstance(at, float):
-        at = [at for _ in range(len(cv_name_list))]
-        
+    n_cv = len(cv_name_list)
+    kappa, step, at, final = (_bcast(v, n_cv) for v in (kappa, step, at, final))
+
     res_list, res_names = make_moving_restraint_list(
         cv_name_list, kappa, step, nsteps, at, final
     )
@@ -254,7 +270,7 @@ def make_restraint_plumed(
     content_list += res_list
     cv_name_list.append(res_names[0]+".force2")
     content_list.append(make_print(cv_name_list, stride, output))
-    return list_to_string(content_list, split_sign="\n")
+    return "\n".join(content_list) + "\n"
 
 
 def make_plain_plumed(
@@ -276,14 +292,13 @@ def make_plain_plumed(
             make_distance_list_from_file(conf, selected_atomid)
         content_list += cv_content_list
     elif mode == "custom":
-        for cv_file_ in cv_file:
-            if not os.path.basename(cv_file_).endswith("pdb"):
-                ret, cv_name_list, _ = user_plumed_def(cv_file_, stride, output)
-        content_list.append(ret)
+        ret, cv_name_list, _ = user_plumed_def(_pick_cv(cv_file), stride, output)
+        # Lines read from the user file keep their own newlines.
+        content_list.append(ret.rstrip("\n"))
     else:
         raise RuntimeError("Unknown mode for making plumed files.")
     content_list.append(make_print_bias(cv_name_list, stride, output))
-    return list_to_string(content_list, split_sign="\n")
+    return "\n".join(content_list) + "\n"
 
 
 def get_cv_name(
@@ -300,9 +315,7 @@ def get_cv_name(
     elif mode == "distance":
         _, cv_name_list = make_distance_list_from_file(conf, selected_atomid)
     elif mode == "custom":
-        for cv_file_ in cv_file:
-            if not os.path.basename(cv_file_).endswith("pdb"):
-                _, cv_name_list, _ = user_plumed_def(cv_file_, stride, "test.out")
+        _, cv_name_list, _ = user_plumed_def(_pick_cv(cv_file), stride, "test.out")
     else:
         raise RuntimeError("Unknown mode for making plumed files.")
     return cv_name_list
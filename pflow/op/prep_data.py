@@ -98,7 +98,8 @@ class PrepData(OP):
                 "conf_begin": Artifact(Path),
                 "trajectory_aligned": Artifact(Path),
                 "task_name": BigParameter(str),
-                "plm_out": Artifact(Path)
+                "plm_out": Artifact(Path),
+                "plm_npy": Artifact(Path, optional=True)
             }
         )
 
@@ -125,6 +126,8 @@ class PrepData(OP):
 
             - `conf_begin`: (`Artifact(Path)`) Path for the first frames of aligned traj.
             - `trajectory_aligned`: (`Artifact(Path)`) Path of aligned traj.
+            - `plm_out`: (`Artifact(Path)`) PLUMED output of the labeling simulation.
+            - `plm_npy`: (`Artifact(Path)`) Optional `plm_out` already parsed into a npy array.
           
         Returns
         -------
@@ -146,7 +149,10 @@ class PrepData(OP):
             topology = traj.top.to_openmm()
             
             # Extract the force information
-            plm_data = np.loadtxt(op_in["plm_out"])
+            if op_in["plm_npy"] is not None:
+                plm_data = np.load(op_in["plm_npy"])
+            else:
+                plm_data = np.loadtxt(op_in["plm_out"])
             forces_data = plm_data[:,2]
             forces_data = np.sqrt(forces_data)
 
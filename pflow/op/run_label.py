@@ -1,4 +1,5 @@
 import os, sys
+import struct
 import logging
 from typing import Dict, List
 from pathlib import Path
@@ -17,17 +18,17 @@ from pflow.constants import (
         gmx_tpr_name,
         plumed_input_name,
         plumed_output_name,
+        plumed_output_npy_name,
         gmx_mdrun_log,
         gmx_xtc_name,
-        gmx_align_name,
         gmx_center_name
     )
 
-from pflow.utils import run_command, set_directory, list_to_string, write_txt
-from pflow.common.gromacs.trjconv import pbc_trjconv, center_trjconv, align_trjconv, begin_trjconv
+from pflow.utils import run_command_streaming, set_directory, list_to_string, write_txt
+from pflow.common.gromacs.trjconv import pbc_trjconv, fit_center_trjconv
 from pflow.common.sampler.command import get_grompp_cmd, get_mdrun_cmd
 import numpy as np
-import matplotlib.pyplot as plt
+from PIL import Image
 import json
 
 logging.basicConfig(
@@ -38,6 +39,69 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Every XTC frame starts with this big-endian magic number.
+_xtc_magic = struct.pack(">i", 1995)
+_mdrun_log_tail_bytes = 65536
+
+
+def _mdrun_succeeded(xtc, log) -> bool:
+    """Check that mdrun wrote at least one XTC frame and no fatal error in its log."""
+    if not os.path.exists(xtc):
+        return False
+    with open(xtc, "rb") as fp:
+        if fp.read(len(_xtc_magic)) != _xtc_magic:
+            return False
+    if os.path.exists(log):
+        with open(log, "rb") as fp:
+            fp.seek(max(os.path.getsize(log) - _mdrun_log_tail_bytes, 0))
+            if b"Fatal error" in fp.read():
+                return False
+    return True
+
+
+def _ensure_link(src, name):
+    """Hardlink `src` as `name`, falling back to a symlink; skip if already linked."""
+    try:
+        if os.readlink(name) == str(src):
+            return
+    except OSError:
+        pass
+    if os.path.exists(name) and os.path.samefile(src, name):
+        return
+    try:
+        os.link(src, name)
+    except OSError:
+        os.symlink(src, name)
+
+
+def _plot_trace(y, path, W=800, H=400):
+    """Rasterize a 1D trace into a grayscale PNG without going through matplotlib."""
+    img = np.full((H, W), 255, np.uint8)
+    if len(y) > 0:
+        idx = np.linspace(0, len(y) - 1, W).astype(np.int64)
+        ys = y[idx]
+        # Skip non-finite samples like matplotlib does, an all-NaN trace stays blank
+        finite = np.isfinite(ys)
+        if finite.any():
+            cols = np.arange(W)[finite]
+            ys = ys[finite]
+            row = ((H - 1) * (ys - ys.min()) / max(np.ptp(ys), 1e-9)).astype(np.int32)
+            img[H - 1 - row, cols] = 0
+    Image.fromarray(img).save(path)
+
+
+def _plot_trace_mpl(y, path):
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+    plt.figure(figsize=(8,6))
+    plt.plot(y)
+    plt.xlabel('Frames')
+    plt.ylabel('Distance')
+    plt.title('Distance during simulation')
+    plt.savefig(path)
+    plt.close()
+
 
 class RunLabel(OP):
 
@@ -66,6 +130,7 @@ class RunLabel(OP):
             {
                 "plm_out": Artifact(Path, archive = None),
                 "plm_fig": Artifact(Path, archive = None),
+                "plm_npy": Artifact(Path, optional=True, archive = None),
                 "conf_begin": Artifact(Path, archive = None),
                 "trajectory_aligned": Artifact(Path, archive = None),
                 "md_log": Artifact(Path, archive = None),
@@ -128,70 +193,73 @@ class RunLabel(OP):
 
         with set_directory(op_in["task_path"]):
             if op_in["forcefield"] is not None:
-                os.symlink(op_in["forcefield"], op_in["forcefield"].name)
+                _ensure_link(op_in["forcefield"], op_in["forcefield"].name)
             if op_in["index_file"] is not None:
-                os.symlink(op_in["index_file"], op_in["index_file"].name)
+                _ensure_link(op_in["index_file"], op_in["index_file"].name)
                 
             if grompp_cmd is not None:
                 logger.info(list_to_string(grompp_cmd, " "))
-                return_code, out, err = run_command(grompp_cmd)
+                return_code, err = run_command_streaming(grompp_cmd, logger)
                 assert return_code == 0, err
-                logger.info(err)
             if run_cmd is not None:
                 logger.info(list_to_string(run_cmd, " "))
-                return_code, out, err = run_command(run_cmd)
+                return_code, err = run_command_streaming(run_cmd, logger)
                 assert return_code == 0, err
-                logger.info(err)
 
-            pbc_trjconv(xtc = gmx_xtc_name,output = "md_nopbc.xtc")
-            align_trjconv(xtc = "md_nopbc.xtc", output_group = 1, output=gmx_align_name)
-            begin_trjconv(xtc = gmx_align_name, output_group = 3)
-            center_trjconv(xtc = gmx_align_name,output_group = 3, output=gmx_center_name)
-            
-            # set figure for plotting
-            plt.figure(figsize=(8,6))
-            # Load the data from the text file
-            data = np.loadtxt(plumed_output_name)
-            # Extract the second column
-            second_column = data[:, 1]
-            # Create the plot
-            plt.plot(second_column)
-            # Add labels and title
-            plt.xlabel('Frames')
-            plt.ylabel('Distance')
-            plt.title('Distance during simulation')
-
-            # Show the plot
-            plt.savefig("plm.png")
-            
+            # Fail fast without post-processing, the slice then exports no artifacts at all
+            if not _mdrun_succeeded(gmx_xtc_name, gmx_mdrun_log):
+                raise RuntimeError(
+                    "No valid trajectory from mdrun in task %s, skipping post-processing." % op_in["task_name"]
+                )
+
+            pbc_trjconv(xtc = gmx_xtc_name, output = "md_nopbc.xtc")
+            fit_center_trjconv(xtc = "md_nopbc.xtc", output_group = 3, output=gmx_center_name)
+            fit_center_trjconv(xtc = "md_nopbc.xtc", output_group = 3, output="begin.gro", center = False, begin = 0, end = 0)
+
+            # Parse the PLUMED output once, downstream data steps reuse the npy
+            plm_data = np.loadtxt(plumed_output_name, ndmin=2)
+            np.save(plumed_output_npy_name, plm_data)
+            second_column = plm_data[:, 1]
+            # Plot the CV trace, matplotlib is only used on request
+            if os.environ.get("PFLOW_USE_MPL"):
+                _plot_trace_mpl(second_column, "plm.png")
+            else:
+                _plot_trace(second_column, "plm.png")
+
             write_txt("task_name",op_in["task_name"])
          
-        task_name_path = None   
+        task_dir = op_in["task_path"]
+        present = {entry.name for entry in os.scandir(task_dir)}
+        task_name_path = None
         traj_aligned_path = None
         conf_begin_path = None
         if op_in["label_config"]["type"] == "gmx":
             mdrun_log = gmx_mdrun_log
-            if os.path.exists(op_in["task_path"].joinpath(gmx_center_name)):
-                traj_aligned_path = op_in["task_path"].joinpath(gmx_center_name)
-            if os.path.exists(op_in["task_path"].joinpath("begin.gro")):
-                conf_begin_path = op_in["task_path"].joinpath("begin.gro")
+            if gmx_center_name in present:
+                traj_aligned_path = task_dir.joinpath(gmx_center_name)
+            if "begin.gro" in present:
+                conf_begin_path = task_dir.joinpath("begin.gro")
 
-        if os.path.exists(op_in["task_path"].joinpath("task_name")):
-            task_name_path = op_in["task_path"].joinpath("task_name")
+        if "task_name" in present:
+            task_name_path = task_dir.joinpath("task_name")
         plm_out = None
-        if os.path.exists(op_in["task_path"].joinpath(plumed_output_name)):
-            plm_out = op_in["task_path"].joinpath(plumed_output_name)
+        if plumed_output_name in present:
+            plm_out = task_dir.joinpath(plumed_output_name)
         plm_fig = None
-        if os.path.exists(op_in["task_path"].joinpath("plm.png")):
-            plm_fig = op_in["task_path"].joinpath("plm.png")
+        if "plm.png" in present:
+            plm_fig = task_dir.joinpath("plm.png")
+        plm_npy = None
+        if plumed_output_npy_name in present:
+            plm_npy = task_dir.joinpath(plumed_output_npy_name)
             
         op_out = OPIO(
             {
                 "plm_out": plm_out,
                 "plm_fig": plm_fig,
+                "plm_npy": plm_npy,
                 "trajectory_aligned": traj_aligned_path,
                 "conf_begin": conf_begin_path,
-                "md_log": op_in["task_path"].joinpath(mdrun_log),
+                "md_log": task_dir.joinpath(mdrun_log),
                 "succeeded_task_name": task_name_path
             }
         )
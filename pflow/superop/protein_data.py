@@ -1,5 +1,4 @@
 from typing import Dict, List
-from copy import deepcopy
 from dflow import (
     InputParameter,
     Inputs,
@@ -46,7 +45,8 @@ class Data(Steps):
             "succeeded_task_names": InputArtifact(),
             "conf_begin": InputArtifact(),
             "trajectory_aligned": InputArtifact(),
-            "plm_out": InputArtifact()
+            "plm_out": InputArtifact(),
+            "plm_npy": InputArtifact(optional=True)
         }
         self._output_parameters = {
         }
@@ -105,6 +105,16 @@ class Data(Steps):
         return self._keys
 
 
+def _shallow_config(cfg: Dict) -> Dict:
+    # Only the nested dicts that get popped from downstream need their own copy;
+    # `init_executor` pops "type" from the executor dict.
+    out = dict(cfg)
+    for key in ("template_config", "executor"):
+        if isinstance(out.get(key), dict):
+            out[key] = dict(out[key])
+    return out
+
+
 def _data(
         data_steps,
         step_keys,
@@ -116,8 +126,8 @@ def _data(
         upload_python_package : str = None,
         retry_times: int = None
     ):
-    prep_data_config = deepcopy(prep_data_config)
-    combine_data_config = deepcopy(combine_data_config)
+    prep_data_config = _shallow_config(prep_data_config)
+    combine_data_config = _shallow_config(combine_data_config)
     prep_template_config = prep_data_config.pop('template_config')
     combine_template_config = combine_data_config.pop('template_config')
     prep_executor = init_executor(prep_data_config.pop('executor'))
@@ -162,7 +172,7 @@ def _data(
         group_size=100,
         pool_size=1,
         input_parameter=["task_name"],
-        input_artifact=["conf_begin","trajectory_aligned", "plm_out"],
+        input_artifact=["conf_begin","trajectory_aligned", "plm_out", "plm_npy"],
         output_artifact=["traj_npz"]),
         **prep_template_config,
     ),
@@ -172,7 +182,8 @@ def _data(
         artifacts={
             "trajectory_aligned": data_steps.inputs.artifacts['trajectory_aligned'],
             "conf_begin": data_steps.inputs.artifacts['conf_begin'],
-            "plm_out": data_steps.inputs.artifacts['plm_out']
+            "plm_out": data_steps.inputs.artifacts['plm_out'],
+            "plm_npy": data_steps.inputs.artifacts['plm_npy']
         },
         key = step_keys['prep_data']+"-{{item}}",
         executor = prep_executor,
@@ -55,6 +55,7 @@ class Label(Steps):
         self._output_artifacts = {
             "conf_begin": OutputArtifact(),
             "plm_out": OutputArtifact(),
+            "plm_npy": OutputArtifact(),
             "trajectory_aligned": OutputArtifact(),
             "succeeded_task_names": OutputArtifact()
         }
@@ -194,7 +195,7 @@ def _label(
         pool_size=1,
         input_parameter=["task_name"],
         input_artifact=["task_path"],
-        output_artifact=["plm_out","plm_fig","trajectory_aligned","conf_begin","md_log","succeeded_task_name"]
+        output_artifact=["plm_out","plm_fig","plm_npy","trajectory_aligned","conf_begin","md_log","succeeded_task_name"]
         ),
         **run_template_config,
     ),
@@ -222,5 +223,6 @@ def _label(
     label_steps.outputs.artifacts["trajectory_aligned"]._from = run_label.outputs.artifacts["trajectory_aligned"]
     label_steps.outputs.artifacts["conf_begin"]._from = run_label.outputs.artifacts["conf_begin"]
     label_steps.outputs.artifacts["plm_out"]._from = run_label.outputs.artifacts["plm_out"]
+    label_steps.outputs.artifacts["plm_npy"]._from = run_label.outputs.artifacts["plm_npy"]
     
     return label_steps
@@ -10,8 +10,12 @@ from pflow.constants import (
     )
 from pflow.utils import read_txt
 from pflow.common.gromacs import make_md_mdp_string
-from pflow.common.mol import get_distance_from_atomid
-from pflow.common.plumed import make_plain_plumed, make_restraint_plumed, get_cv_name
+from pflow.common.plumed import (
+    make_plain_plumed,
+    make_restraint_plumed,
+    get_cv_name,
+    get_cached_distance_from_atomid
+)
 
 
 class TaskBuilder(ABC):
@@ -180,7 +184,7 @@ def build_plumed_restraint_dict(
     plumed_task_files = {}
     if selected_atomid is not None:
         at = []
-        cv_info = get_distance_from_atomid(conf, selected_atomid)
+        cv_info = get_cached_distance_from_atomid(conf, selected_atomid)
         for dis_id in range(len(selected_atomid)):
             at.append(cv_info["%s %s"%(selected_atomid[dis_id][0],selected_atomid[dis_id][1])])
     plm_content = make_restraint_plumed(
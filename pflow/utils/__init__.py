@@ -10,6 +10,6 @@ from pflow.utils.files import (
     load_json
 )
 from pflow.utils.format import list_to_string
-from pflow.utils.command import run_command
+from pflow.utils.command import run_command, run_command_streaming
 from pflow.utils.path import set_directory
 from pflow.utils.set_config import init_executor, normalize_resources
\ No newline at end of file
@@ -1,5 +1,7 @@
 import subprocess
-from typing import Optional, List
+import logging
+from collections import deque
+from typing import Optional, List, Tuple
 
 def run_command(
         cmd: List, 
@@ -21,3 +23,30 @@ def run_command(
         out, err = subp.communicate(input=stdin)
         return_code = subp.poll()
     return return_code, out, err
+
+
+def run_command_streaming(
+        cmd: List,
+        logger: logging.Logger,
+        tail: int = 50
+    ) -> Tuple[int, str]:
+    """Run `cmd` with stderr merged into stdout, logging each line as it arrives.
+
+    Only the last `tail` lines are kept in memory and returned with the exit code.
+    """
+    last_lines = deque(maxlen=tail)
+    with subprocess.Popen(
+        args=cmd,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.STDOUT,
+        bufsize=1,
+        encoding="utf-8",
+        errors="replace"
+    ) as subp:
+        for line in subp.stdout:
+            line = line.rstrip("\n")
+            logger.info(line)
+            last_lines.append(line)
+        return_code = subp.wait()
+    return return_code, "\n".join(last_lines)